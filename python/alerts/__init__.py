@@ -3,7 +3,9 @@ Alert and notification modules
 """
 
 from .telegram_dispatcher import TelegramDispatcher
+from .rate_limit import TokenBucket
 
 __all__ = [
-    'TelegramDispatcher'
+    'TelegramDispatcher',
+    'TokenBucket'
 ]
\ No newline at end of file
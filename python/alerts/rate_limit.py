@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Rate limiting helpers shared by the alert senders
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: allows bursts up to capacity, refills at rate/s"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+
+    async def acquire(self, n: float = 1):
+        """Wait until n tokens are available, then take them"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            await asyncio.sleep((n - self.tokens) / self.rate)
@@ -7,16 +7,43 @@ Sends formatted alerts with rich information to Telegram
 import asyncio
 import logging
 import os
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+from datetime import datetime
 import aiohttp
 from dotenv import load_dotenv
 
+from .rate_limit import TokenBucket
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 
+class _Markup(NamedTuple):
+    """Inline markup helpers for one Telegram parse mode"""
+    bold: Callable[[str], str]
+    italic: Callable[[str], str]
+    code: Callable[[str], str]
+    link: Callable[[str, str], str]
+
+
+_MARKUPS = {
+    'html': _Markup(
+        bold=lambda text: f"<b>{text}</b>",
+        italic=lambda text: f"<i>{text}</i>",
+        code=lambda text: f"<code>{text}</code>",
+        link=lambda url, text: f"<a href='{url}'>{text}</a>",
+    ),
+    'markdown': _Markup(
+        bold=lambda text: f"**{text}**",
+        italic=lambda text: f"_{text}_",
+        code=lambda text: f"`{text}`",
+        link=lambda url, text: f"[{text}]({url})",
+    ),
+}
+
+
 class TelegramDispatcher:
     """Enhanced Telegram bot for sending alerts"""
 
@@ -35,15 +62,35 @@ class TelegramDispatcher:
         self.session: Optional[aiohttp.ClientSession] = None
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
 
-        # Rate limiting
-        self.last_message_time = datetime.now()
-        self.min_interval = timedelta(seconds=1)  # Minimum 1 second between messages
-
-        # Message queue
+        # Per-chain chat overrides (TELEGRAM_CHAT_ID_<CHAIN>), resolved lazily
+        self.chain_chat_ids: Dict[str, str] = {}
+
+        # Rate limiting: Telegram allows ~1 msg/s per chat and ~30 msg/s per bot
+        chat_rate = float(os.getenv('TELEGRAM_CHAT_RATE', 1.0))
+        self.chat_buckets: Dict[str, TokenBucket] = defaultdict(
+            lambda: TokenBucket(rate=chat_rate, capacity=1)
+        )
+        self.global_bucket = TokenBucket(
+            rate=float(os.getenv('TELEGRAM_GLOBAL_RATE', 25)),
+            capacity=float(os.getenv('TELEGRAM_GLOBAL_BURST', 30))
+        )
+
+        # Message queue of (chat_id, message, delivered future). Chats are sent
+        # to concurrently; the per-chat lock keeps each chat in order and
+        # within its limit.
         self.message_queue = asyncio.Queue()
         self.queue_processor_task = None
-
-        logger.info(f"Telegram dispatcher initialized (Enabled: {self.enabled})")
+        self._chat_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Messages allowed to wait per chat; send_alert blocks once a chat is
+        # full, so callers can't run ahead of what Telegram will accept
+        chat_backlog = int(os.getenv('TELEGRAM_CHAT_BACKLOG', 1))
+        self._chat_slots: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(chat_backlog)
+        )
+        self._send_semaphore = asyncio.Semaphore(10)
+        self._send_tasks: Set[asyncio.Task] = set()
+
+        logger.info("Telegram dispatcher initialized (Enabled: %s)", self.enabled)
 
     async def initialize(self):
         """Initialize async resources"""
@@ -70,6 +117,14 @@ class TelegramDispatcher:
         if self.queue_processor_task:
             self.queue_processor_task.cancel()
 
+        for task in self._send_tasks:
+            task.cancel()
+
+        # Messages never handed to a sender count as not delivered
+        while not self.message_queue.empty():
+            _, _, delivered = self.message_queue.get_nowait()
+            delivered.cancel()
+
         if self.session:
             await self.session.close()
 
@@ -80,7 +135,7 @@ class TelegramDispatcher:
                 if response.status == 200:
                     data = await response.json()
                     bot_info = data.get('result', {})
-                    logger.info(f"Connected to Telegram bot: @{bot_info.get('username')}")
+                    logger.info("Connected to Telegram bot: @%s", bot_info.get('username'))
                 else:
                     raise Exception(f"Failed to connect to Telegram bot: {response.status}")
 
@@ -121,21 +176,27 @@ class TelegramDispatcher:
         except Exception as e:
             logger.error(f"Error sending startup notification: {e}")
 
+    def _chat_id_for(self, chain: Optional[str]) -> str:
+        """Chat for a chain's alerts, falling back to TELEGRAM_CHAT_ID"""
+        if not chain:
+            return self.chat_id
+
+        chat_id = self.chain_chat_ids.get(chain)
+        if chat_id is None:
+            chat_id = os.getenv(f'TELEGRAM_CHAT_ID_{chain.upper()}') or self.chat_id
+            self.chain_chat_ids[chain] = chat_id
+        return chat_id
+
     async def _process_queue(self):
-        """Process message queue with rate limiting"""
+        """Hand queued messages to per-chat senders"""
         while True:
             try:
                 # Get message from queue
-                message = await self.message_queue.get()
+                chat_id, message, delivered = await self.message_queue.get()
 
-                # Rate limiting
-                time_since_last = datetime.now() - self.last_message_time
-                if time_since_last < self.min_interval:
-                    await asyncio.sleep((self.min_interval - time_since_last).total_seconds())
-
-                # Send message
-                await self._send_raw_message(message)
-                self.last_message_time = datetime.now()
+                task = asyncio.create_task(self._send_one(chat_id, message, delivered))
+                self._send_tasks.add(task)
+                task.add_done_callback(self._send_tasks.discard)
 
             except asyncio.CancelledError:
                 break
@@ -143,14 +204,31 @@ class TelegramDispatcher:
                 logger.error(f"Error processing message queue: {e}")
                 await asyncio.sleep(5)
 
-    async def _send_raw_message(self, message: str):
-        """Send raw message to Telegram"""
+    async def _send_one(self, chat_id: str, message: str, delivered: asyncio.Future):
+        """Send one message, rate limited per chat, and resolve its delivered future"""
+        try:
+            async with self._chat_locks[chat_id]:
+                # Rate limiting
+                await self.chat_buckets[chat_id].acquire()
+                await self.global_bucket.acquire()
+
+                # Send message
+                async with self._send_semaphore:
+                    sent = await self._send_raw_message(message, chat_id)
+            delivered.set_result(sent)
+        finally:
+            if not delivered.done():
+                delivered.cancel()
+            self._chat_slots[chat_id].release()
+
+    async def _send_raw_message(self, message: str, chat_id: Optional[str] = None) -> bool:
+        """Send raw message to Telegram; True if Telegram accepted it"""
         if not self.enabled or not self.session:
-            return
+            return False
 
         try:
             data = {
-                'chat_id': self.chat_id,
+                'chat_id': chat_id or self.chat_id,
                 'text': message,
                 'parse_mode': 'HTML',
                 'disable_web_page_preview': False
@@ -160,14 +238,23 @@ class TelegramDispatcher:
                 if response.status != 200:
                     error_text = await response.text()
                     logger.error(f"Failed to send Telegram message: {error_text}")
+                    return False
+                return True
 
         except Exception as e:
             logger.error(f"Error sending Telegram message: {e}")
+            return False
+
+    async def send_alert(self, token_data: Dict, priority: str = 'medium') -> Optional[asyncio.Future]:
+        """Queue a formatted alert for Telegram
 
-    async def send_alert(self, token_data: Dict, priority: str = 'medium'):
-        """Send formatted alert to Telegram"""
+        Waits while the alert's chat already has TELEGRAM_CHAT_BACKLOG messages
+        pending. Returns a future that resolves to True once Telegram accepted
+        the message (False if it failed, cancelled on shutdown), or None if
+        nothing was queued.
+        """
         if not self.enabled:
-            return
+            return None
 
         try:
             # Format message based on priority
@@ -184,14 +271,22 @@ class TelegramDispatcher:
             # Build message
             message = self._format_alert_message(token_data, emoji, prefix)
 
-            # Add to queue
-            await self.message_queue.put(message)
+            # Add to queue once the chat has room
+            chat_id = self._chat_id_for(token_data.get('chain'))
+            await self._chat_slots[chat_id].acquire()
+            delivered = asyncio.get_running_loop().create_future()
+            await self.message_queue.put((chat_id, message, delivered))
+            return delivered
 
         except Exception as e:
             logger.error(f"Error sending alert: {e}")
+            return None
+
+    def _format_alert_message(self, token_data: Dict, emoji: str, prefix: str, fmt: str = 'html') -> str:
+        """Format token data into compact alert message
 
-    def _format_alert_message(self, token_data: Dict, emoji: str, prefix: str) -> str:
-        """Format token data into compact alert message"""
+        fmt selects the markup: 'html' (what send_alert uses) or 'markdown'.
+        """
         chain = token_data.get('chain', 'Unknown').upper()
         symbol = token_data.get('symbol', 'Unknown')
         name = token_data.get('name', 'Unknown')
@@ -204,14 +299,15 @@ class TelegramDispatcher:
         message_format = os.getenv('TELEGRAM_MESSAGE_FORMAT', 'compact').lower()
 
         if message_format == 'ultra_compact':
-            return self._format_ultra_compact_message(token_data, emoji, prefix)
+            return self._format_ultra_compact_message(token_data, emoji, prefix, fmt)
         elif message_format == 'compact':
-            return self._format_compact_message(token_data, emoji, prefix)
+            return self._format_compact_message(token_data, emoji, prefix, fmt)
         else:
-            return self._format_standard_message(token_data, emoji, prefix)
+            return self._format_standard_message(token_data, emoji, prefix, fmt)
 
-    def _format_ultra_compact_message(self, token_data: Dict, emoji: str, prefix: str) -> str:
+    def _format_ultra_compact_message(self, token_data: Dict, emoji: str, prefix: str, fmt: str = 'html') -> str:
         """Ultra compact format - Enhanced 4-line version"""
+        markup = _MARKUPS[fmt]
         chain = token_data.get('chain', 'Unknown').upper()
         symbol = token_data.get('symbol', 'Unknown')
         score = token_data.get('score', 0)
@@ -246,7 +342,7 @@ class TelegramDispatcher:
         age_str = self._get_token_age_compact(token_data)
 
         # Line 1: 🔥 HIGH | SOL | $MINU | 82/100 | 🆕2h
-        line1 = f"{emoji} <b>{priority}</b> | {chain_short} | ${symbol} | {score}/100"
+        line1 = f"{emoji} {markup.bold(priority)} | {chain_short} | ${symbol} | {score}/100"
         if age_str:
             line1 += f" | {age_str}"
 
@@ -280,27 +376,28 @@ class TelegramDispatcher:
 
         # Chart link
         if token_data.get('dexscreener_link'):
-            links.append(f"📈 <a href='{token_data['dexscreener_link']}'>Chart</a>")
+            links.append(f"📈 {markup.link(token_data['dexscreener_link'], 'Chart')}")
 
         # Contract link
         short_addr = f"{address[:6]}...{address[-4:]}" if len(address) > 10 else address
         if token_data.get('explorer_link'):
-            links.append(f"🔗 <a href='{token_data['explorer_link']}'>Contract</a>")
+            links.append(f"🔗 {markup.link(token_data['explorer_link'], 'Contract')}")
         else:
-            links.append(f"🔗 <code>{short_addr}</code>")
+            links.append(f"🔗 {markup.code(short_addr)}")
 
         # Social links
         if token_data.get('social_links', {}).get('twitter'):
-            links.append(f"🐦 <a href='{token_data['social_links']['twitter']}'>Twitter</a>")
+            links.append(f"🐦 {markup.link(token_data['social_links']['twitter'], 'Twitter')}")
         if token_data.get('social_links', {}).get('telegram'):
-            links.append(f"💬 <a href='{token_data['social_links']['telegram']}'>TG</a>")
+            links.append(f"💬 {markup.link(token_data['social_links']['telegram'], 'TG')}")
 
         line4 = " | ".join(links) if links else "🔗 Links not available"
 
         return f"{line1}\n{line2}\n{line3}\n{line4}"
 
-    def _format_compact_message(self, token_data: Dict, emoji: str, prefix: str) -> str:
+    def _format_compact_message(self, token_data: Dict, emoji: str, prefix: str, fmt: str = 'html') -> str:
         """Compact format - optimized for readability"""
+        markup = _MARKUPS[fmt]
         chain = token_data.get('chain', 'Unknown').upper()
         symbol = token_data.get('symbol', 'Unknown')
         name = token_data.get('name', 'Unknown')
@@ -334,13 +431,13 @@ class TelegramDispatcher:
 
         # Build compact message
         lines = [
-            f"<b>{emoji} {prefix.replace('CONFIDENCE ALERT', 'ALERT')} {emoji}</b>",
+            markup.bold(f"{emoji} {prefix.replace('CONFIDENCE ALERT', 'ALERT')} {emoji}"),
             "",
-            f"<b>Token:</b> {name} (${symbol})",
-            f"<b>Chain:</b> {chain} | <b>DEX:</b> {dex}",
-            f"<b>Score:</b> {score}/100 {score_indicator}",
+            f"{markup.bold('Token:')} {name} (${symbol})",
+            f"{markup.bold('Chain:')} {chain} | {markup.bold('DEX:')} {dex}",
+            f"{markup.bold('Score:')} {score}/100 {score_indicator}",
             "",
-            f"<b>📊 Key Metrics</b>",
+            markup.bold("📊 Key Metrics"),
             f"Liq: {liq_str} | Vol: {vol_str} | Hold: {holders}",
         ]
 
@@ -366,14 +463,14 @@ class TelegramDispatcher:
         if score >= 60 and positives:
             lines.extend([
                 "",
-                "<b>⚡ Strengths</b>"
+                markup.bold("⚡ Strengths")
             ])
             for positive in positives[:3]:
                 lines.append(f"• {positive}")
         elif warnings:
             lines.extend([
                 "",
-                "<b>⚠️ Cautions</b>"
+                markup.bold("⚠️ Cautions")
             ])
             for warning in warnings[:3]:
                 lines.append(f"• {warning}")
@@ -385,18 +482,18 @@ class TelegramDispatcher:
         # Contract
         short_addr = f"{address[:6]}...{address[-4:]}" if len(address) > 10 else address
         if token_data.get('explorer_link'):
-            links.append(f"<a href='{token_data['explorer_link']}'>Contract</a>")
+            links.append(markup.link(token_data['explorer_link'], "Contract"))
 
         # Chart
         if token_data.get('dexscreener_link'):
-            links.append(f"<a href='{token_data['dexscreener_link']}'>Chart</a>")
+            links.append(markup.link(token_data['dexscreener_link'], "Chart"))
 
         # Social
         social_links = token_data.get('social_links', {})
         if social_links.get('twitter'):
-            links.append(f"<a href='{social_links['twitter']}'>Twitter</a>")
+            links.append(markup.link(social_links['twitter'], "Twitter"))
         if social_links.get('telegram'):
-            links.append(f"<a href='{social_links['telegram']}'>Telegram</a>")
+            links.append(markup.link(social_links['telegram'], "Telegram"))
 
         if links:
             lines.append(f"🔗 {' | '.join(links)}")
@@ -404,14 +501,15 @@ class TelegramDispatcher:
         # Footer
         lines.extend([
             "",
-            f"<i>⏰ {datetime.now().strftime('%Y-%m-%d %H:%M')} UTC</i>",
-            "<i>⚠️ DYOR - Not financial advice</i>"
+            markup.italic(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M')} UTC"),
+            markup.italic("⚠️ DYOR - Not financial advice")
         ])
 
         return "\n".join(lines)
 
-    def _format_standard_message(self, token_data: Dict, emoji: str, prefix: str) -> str:
+    def _format_standard_message(self, token_data: Dict, emoji: str, prefix: str, fmt: str = 'html') -> str:
         """Standard format - original detailed version"""
+        markup = _MARKUPS[fmt]
         chain = token_data.get('chain', 'Unknown').upper()
         symbol = token_data.get('symbol', 'Unknown')
         name = token_data.get('name', 'Unknown')
@@ -429,14 +527,14 @@ class TelegramDispatcher:
 
         # Build message
         lines = [
-            f"<b>{emoji} {prefix} {emoji}</b>",
+            markup.bold(f"{emoji} {prefix} {emoji}"),
             "",
-            f"<b>Token:</b> {name} ({symbol})",
-            f"<b>Chain:</b> {chain}",
-            f"<b>DEX:</b> {dex}",
-            f"<b>Score:</b> {score}/100 ({analysis.get('confidence_level', 'Unknown')})",
+            f"{markup.bold('Token:')} {name} ({symbol})",
+            f"{markup.bold('Chain:')} {chain}",
+            f"{markup.bold('DEX:')} {dex}",
+            f"{markup.bold('Score:')} {score}/100 ({analysis.get('confidence_level', 'Unknown')})",
             "",
-            f"<b>📊 Metrics</b>",
+            markup.bold("📊 Metrics"),
             f"• Liquidity: {liquidity_str}",
             f"• Volume 24h: {volume_str}"
         ]
@@ -457,7 +555,7 @@ class TelegramDispatcher:
         if analysis.get('scores'):
             lines.extend([
                 "",
-                "<b>📈 Score Breakdown</b>"
+                markup.bold("📈 Score Breakdown")
             ])
             for metric, value in analysis['scores'].items():
                 metric_name = metric.replace('_', ' ').title()
@@ -468,7 +566,7 @@ class TelegramDispatcher:
         if warnings:
             lines.extend([
                 "",
-                "<b>⚠️ Warnings</b>"
+                markup.bold("⚠️ Warnings")
             ])
             for warning in warnings[:3]:  # Limit to 3 warnings
                 lines.append(f"• {warning}")
@@ -478,7 +576,7 @@ class TelegramDispatcher:
         if positives:
             lines.extend([
                 "",
-                "<b>✅ Positives</b>"
+                markup.bold("✅ Positives")
             ])
             for positive in positives[:3]:  # Limit to 3 positives
                 lines.append(f"• {positive}")
@@ -486,40 +584,40 @@ class TelegramDispatcher:
         # Add links
         lines.extend([
             "",
-            "<b>🔗 Links</b>"
+            markup.bold("🔗 Links")
         ])
 
         # Contract address (shortened)
         short_address = f"{address[:6]}...{address[-4:]}" if len(address) > 10 else address
-        lines.append(f"• Contract: <code>{short_address}</code>")
+        lines.append(f"• Contract: {markup.code(short_address)}")
 
         # Explorer link
         if token_data.get('explorer_link'):
-            lines.append(f"• <a href='{token_data['explorer_link']}'>View on Explorer</a>")
+            lines.append(f"• {markup.link(token_data['explorer_link'], 'View on Explorer')}")
 
         # DexScreener link
         if token_data.get('dexscreener_link'):
-            lines.append(f"• <a href='{token_data['dexscreener_link']}'>View on DexScreener</a>")
+            lines.append(f"• {markup.link(token_data['dexscreener_link'], 'View on DexScreener')}")
 
         # Social links
         social_links = token_data.get('social_links', {})
         if social_links.get('website'):
-            lines.append(f"• <a href='{social_links['website']}'>Website</a>")
+            lines.append(f"• {markup.link(social_links['website'], 'Website')}")
         if social_links.get('twitter'):
-            lines.append(f"• <a href='{social_links['twitter']}'>Twitter</a>")
+            lines.append(f"• {markup.link(social_links['twitter'], 'Twitter')}")
         if social_links.get('telegram'):
-            lines.append(f"• <a href='{social_links['telegram']}'>Telegram</a>")
+            lines.append(f"• {markup.link(social_links['telegram'], 'Telegram')}")
 
         # Add timestamp
         lines.extend([
             "",
-            f"<i>🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}</i>"
+            markup.italic(f"🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
         ])
 
         # Add disclaimer
         lines.extend([
             "",
-            "<i>⚠️ Educational purposes only. Not financial advice. Always DYOR!</i>"
+            markup.italic("⚠️ Educational purposes only. Not financial advice. Always DYOR!")
         ])
 
         return "\n".join(lines)
@@ -576,7 +674,7 @@ class TelegramDispatcher:
                 return f"⏱️ {days}d old"
 
         except Exception as e:
-            logger.debug(f"Error calculating token age: {e}")
+            logger.debug("Error calculating token age: %s", e)
             return ""
 
     def _get_token_age_compact(self, token_data: Dict) -> str:
@@ -613,7 +711,7 @@ class TelegramDispatcher:
                 return f"⏱️{days}d"
 
         except Exception as e:
-            logger.debug(f"Error calculating token age: {e}")
+            logger.debug("Error calculating token age: %s", e)
             return ""
 
     async def send_summary(self, stats: Dict):
@@ -651,7 +749,7 @@ class TelegramDispatcher:
             ])
 
             message = "\n".join(lines)
-            await self.message_queue.put(message)
+            await self.message_queue.put((self.chat_id, message))
 
         except Exception as e:
             logger.error(f"Error sending summary: {e}")
@@ -677,7 +775,7 @@ class TelegramDispatcher:
             ])
 
             message = "\n".join(lines)
-            await self.message_queue.put(message)
+            await self.message_queue.put((self.chat_id, message))
 
         except Exception as e:
             logger.error(f"Error sending error alert: {e}")
@@ -17,6 +17,13 @@ import aiohttp  # FIXED: Import aiohttp
 from dotenv import load_dotenv
 import random # FIXED: Import random
 
+# uvloop is optional; fall back to the default asyncio event loop
+try:
+    import uvloop
+    _loop_factory = uvloop.new_event_loop
+except ImportError:
+    _loop_factory = None
+
 # Load environment variables
 load_dotenv()
 
@@ -257,7 +264,8 @@ Thank you for using the educational monitoring system!
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        with asyncio.Runner(loop_factory=_loop_factory) as runner:
+            runner.run(main())
     except KeyboardInterrupt:
         print("\nGoodbye!")
     except Exception as e:
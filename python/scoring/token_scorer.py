@@ -58,6 +58,9 @@ class TokenScorer:
         self.social_cache = {}
         self.contract_cache = {}
 
+        # Blocking Solana RPC client, created on first use
+        self.solana_client: Optional[Client] = None
+
         logger.info("Token Scorer initialized with new criteria")
 
     async def initialize(self):
@@ -177,8 +180,15 @@ class TokenScorer:
         if chain != 'solana':
             return None
 
+        # The solana Client is synchronous; keep its RPC round trips off the event loop
+        return await asyncio.to_thread(self._fetch_solana_holder_distribution, token_address)
+
+    def _fetch_solana_holder_distribution(self, token_address: str) -> Optional[Dict]:
+        """Blocking holder lookup for a Solana mint (runs in a worker thread)"""
         try:
-            client = Client(os.getenv("RPC_HTTP"))
+            if self.solana_client is None:
+                self.solana_client = Client(os.getenv("RPC_HTTP"))
+            client = self.solana_client
             mint_pubkey = Pubkey.from_string(token_address)
 
             # Get total supply
@@ -3,19 +3,52 @@
 Quick test script to verify Telegram bot connection
 """
 
-import requests
+import hashlib
+import httpx
 import json
+import os
 import sys
-
-# Your Telegram credentials
-BOT_TOKEN = "7558858258:AAFSRDFIG4Fh15iAehE8bGIg-iWuBblR6SU"
-CHAT_ID = "1507876704"
-
-def test_telegram_connection():
-    """Test if the Telegram bot can send messages"""
-
-    # Test message
-    message = """
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+try:
+    import orjson
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    # Fall back to the stdlib encoder when orjson is not installed
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    _loads = json.loads
+
+load_dotenv()
+
+# Telegram credentials (from the environment or .env)
+BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+
+# Telegram API endpoints
+BASE_URL = f"https://api.telegram.org/bot{BOT_TOKEN}"
+SEND_URL = f"{BASE_URL}/sendMessage"
+INFO_URL = f"{BASE_URL}/getMe"
+
+# Shared client so getMe and sendMessage reuse one connection
+# (multiplexed over HTTP/2 when the h2 package is installed)
+SESSION = httpx.Client(
+    http2=HTTP2,
+    headers={"Content-Type": "application/json"},
+    limits=httpx.Limits(max_connections=4, max_keepalive_connections=1),
+    timeout=10
+)
+
+# Test message sent by test_telegram_connection()
+_TEST_MESSAGE = """
 🎯 **TELEGRAM BOT TEST**
 
 ✅ Connection successful!
@@ -33,24 +66,25 @@ This bot will send you alerts about:
 No actual trading will be performed.
 """
 
-    # Telegram API URL
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+_TEST_PAYLOAD = {
+    "text": _TEST_MESSAGE,
+    "parse_mode": "Markdown"
+}
+
+def test_telegram_connection():
+    """Test if the Telegram bot can send messages"""
 
     # Payload
-    payload = {
-        "chat_id": CHAT_ID,
-        "text": message,
-        "parse_mode": "Markdown"
-    }
+    payload = {**_TEST_PAYLOAD, "chat_id": CHAT_ID}
 
     try:
         # Send the message
-        response = requests.post(url, json=payload)
+        response = SESSION.post(SEND_URL, content=_dumps(payload))
 
         if response.status_code == 200:
             print("✅ SUCCESS: Telegram bot is working!")
             print("Check your Telegram for the test message.")
-            result = response.json()
+            result = _loads(response.content)
             if result.get("ok"):
                 print(f"Message ID: {result['result']['message_id']}")
             return True
@@ -64,22 +98,54 @@ No actual trading will be performed.
         print(f"❌ ERROR: {str(e)}")
         return False
 
+# getMe responses are cached per token (keyed by hash, never the token itself)
+BOT_INFO_CACHE_DIR = Path.home() / ".cache" / "solana-monitor"
+BOT_INFO_CACHE_TTL = 24 * 60 * 60  # 1 day
+
+
+def _bot_info_cache_path() -> Path:
+    digest = hashlib.sha256(BOT_TOKEN.encode()).hexdigest()[:8]
+    return BOT_INFO_CACHE_DIR / f"bot_{digest}.json"
+
+
+def _load_cached_bot_info():
+    """Return the cached getMe result if it is fresh, else None"""
+    path = _bot_info_cache_path()
+    try:
+        if time.time() - path.stat().st_mtime < BOT_INFO_CACHE_TTL:
+            return _loads(path.read_bytes())
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_bot_info(bot: dict):
+    """Cache a getMe result on disk"""
+    try:
+        BOT_INFO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _bot_info_cache_path().write_bytes(_dumps(bot))
+    except OSError as e:
+        print(f"Could not cache bot info: {e}")
+
+
 def get_bot_info():
     """Get information about the bot"""
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/getMe"
-
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            result = response.json()
-            if result.get("ok"):
-                bot = result["result"]
-                print("\n📤 Bot Information:")
-                print(f"  • Name: {bot.get('first_name', 'Unknown')}")
-                print(f"  • Username: @{bot.get('username', 'Unknown')}")
-                print(f"  • Can Join Groups: {bot.get('can_join_groups', False)}")
-                print(f"  • Can Read Messages: {bot.get('can_read_all_group_messages', False)}")
-                return True
+        bot = _load_cached_bot_info()
+        if bot is None:
+            response = SESSION.get(INFO_URL)
+            if response.status_code == 200:
+                result = _loads(response.content)
+                if result.get("ok"):
+                    bot = result["result"]
+                    _save_bot_info(bot)
+        if bot is not None:
+            print("\n📤 Bot Information:")
+            print(f"  • Name: {bot.get('first_name', 'Unknown')}")
+            print(f"  • Username: @{bot.get('username', 'Unknown')}")
+            print(f"  • Can Join Groups: {bot.get('can_join_groups', False)}")
+            print(f"  • Can Read Messages: {bot.get('can_read_all_group_messages', False)}")
+            return True
         return False
     except Exception as e:
         print(f"Could not get bot info: {e}")
@@ -90,22 +156,29 @@ if __name__ == "__main__":
     print("TELEGRAM BOT CONNECTION TEST")
     print("=" * 50)
 
-    # Get bot info
-    if get_bot_info():
-        print("\n" + "=" * 50)
-        print("Testing message sending...")
-        print("=" * 50)
-
-        # Test sending a message
-        if test_telegram_connection():
-            print("\n✅ Telegram bot is fully configured and working!")
-            print("You can now run the educational monitoring bot.")
-            sys.exit(0)
+    if not BOT_TOKEN or not CHAT_ID:
+        print("\n❌ TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID must be set (see .env).")
+        sys.exit(1)
+
+    try:
+        # Get bot info
+        if get_bot_info():
+            print("\n" + "=" * 50)
+            print("Testing message sending...")
+            print("=" * 50)
+
+            # Test sending a message
+            if test_telegram_connection():
+                print("\n✅ Telegram bot is fully configured and working!")
+                print("You can now run the educational monitoring bot.")
+                sys.exit(0)
+            else:
+                print("\n❌ Failed to send test message.")
+                print("Please check your bot token and chat ID.")
+                sys.exit(1)
         else:
-            print("\n❌ Failed to send test message.")
-            print("Please check your bot token and chat ID.")
+            print("\n❌ Could not connect to Telegram bot.")
+            print("Please check your bot token.")
             sys.exit(1)
-    else:
-        print("\n❌ Could not connect to Telegram bot.")
-        print("Please check your bot token.")
-        sys.exit(1)
\ No newline at end of file
+    finally:
+        SESSION.close()
@@ -2,6 +2,7 @@ from web3 import AsyncWeb3, AsyncHTTPProvider
 print("Web3 version:", AsyncWeb3.__version__)
 print("\nAvailable middleware in web3.middleware:")
 import web3.middleware
-for item in dir(web3.middleware):
-    if not item.startswith('_'):
-        print(f"- {item}")
\ No newline at end of file
+names = getattr(web3.middleware, '__all__', None) or [
+    item for item in dir(web3.middleware) if not item.startswith('_')
+]
+print("\n".join(f"- {item}" for item in names))
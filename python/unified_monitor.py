@@ -6,16 +6,22 @@ This script combines real-time token discovery with API-based data enrichment
 to provide a comprehensive monitoring solution.
 
 ** Refactored Version **
-- Uses asyncio.PriorityQueue for efficient alert handling.
+- Uses a heapq priority queue for efficient alert handling.
 - Uses asyncio.to_thread for non-blocking file I/O.
 - Persists 'sent_alerts' to disk to prevent duplicates on restart.
 - Implements smarter Dexscreener pair logic.
 - Fixes signal handling for graceful shutdown.
 """
 
+import array
 import asyncio
+import hashlib
+import heapq
+import itertools
 import logging
+import operator
 import os
+import random
 import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple
@@ -23,9 +29,54 @@ from dataclasses import dataclass, field
 import json
 import time
 import signal
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 from dotenv import load_dotenv
-import aiohttp
+import httpx
+
+# orjson is optional; fall back to the stdlib encoder when it is missing
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson rejects ints wider than 64 bits (e.g. uint256 total_supply
+            # from the EVM monitors); the stdlib encoder handles them
+            return json.dumps(obj).encode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
+# fcntl is POSIX-only; without it token_queue.json is appended unlocked
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# msgpack is optional; only needed for TOKEN_QUEUE_FORMAT=msgpack
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# uvloop is optional; fall back to the default asyncio event loop
+try:
+    import uvloop
+    _loop_factory = uvloop.new_event_loop
+except ImportError:
+    _loop_factory = None
+
+# HTTP/2 needs the optional h2 package; httpx falls back to HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
 
 # Add src to path
 # (Assuming your monitors are in a 'chains' directory)
@@ -38,6 +89,7 @@ from chains.bnb_monitor import BNBMonitor
 from chains.base_monitor import BaseMonitor
 from scoring.token_scorer import TokenScorer
 from alerts.telegram_dispatcher import TelegramDispatcher
+from alerts.rate_limit import TokenBucket
 
 # Load environment variables
 load_dotenv()
@@ -55,6 +107,42 @@ logger = logging.getLogger(__name__)
 
 # API Endpoints
 DEXSCREENER_API = "https://api.dexscreener.com/latest/dex"
+DEXSCREENER_TOKENS_API = "https://api.dexscreener.com/tokens/v1"
+
+# Our chain names -> Dexscreener chain ids (bound .get, looked up per enrichment)
+_DS_CHAIN_MAP = {"bnb": "bsc", "solana": "solana", "ethereum": "ethereum", "base": "base"}.get
+
+# Dexscreener retries on 429/5xx: attempts per request and backoff cap (seconds)
+DEXSCREENER_MAX_TRIES = 3
+DEXSCREENER_BACKOFF_CAP = 8.0
+
+# Circuit breaker: this many failures within the window (seconds) stops
+# Dexscreener calls for the cooldown (seconds)
+DEXSCREENER_BREAKER_FAILURES = 10
+DEXSCREENER_BREAKER_WINDOW = 30.0
+DEXSCREENER_BREAKER_COOLDOWN = 15.0
+
+# Max token addresses per /tokens/v1 request
+DEXSCREENER_BATCH_SIZE = 30
+
+# Reuse Dexscreener responses for this long (seconds); empty responses
+# (unknown/invalid addresses) only briefly, to absorb retry storms
+ENRICH_CACHE_TTL = 30
+ENRICH_NEGATIVE_CACHE_TTL = 5
+ENRICH_CACHE_MAX = 10_000
+
+# File-based queue consumed by the Rust trading bot (JSON lines), or its
+# msgpack variant (u32 little-endian length + record) for TOKEN_QUEUE_FORMAT=msgpack
+TOKEN_QUEUE_FILE = "token_queue.json"
+TOKEN_QUEUE_MSGPACK_FILE = "token_queue.msgpack"
+
+# token_queue.json writes: max records per flush, and how long (seconds)
+# to wait for more after the first one
+TOKEN_QUEUE_BATCH_SIZE = 64
+TOKEN_QUEUE_BATCH_WINDOW = 0.1
+
+# Compact the sent-alerts log into the JSON snapshot every N sends
+SENT_ALERTS_COMPACT_EVERY = 500
 
 @dataclass
 class MonitoringStats:
@@ -65,7 +153,6 @@ class MonitoringStats:
     low_confidence_alerts: int = 0
     alerts_sent_today: int = 0
     last_alert_reset: datetime = field(default_factory=datetime.now)
-    chain_stats: Dict[str, int] = field(default_factory=dict)
     errors: int = 0
 
     def reset_daily_stats(self):
@@ -75,6 +162,102 @@ class MonitoringStats:
         logger.info("Daily statistics reset")
 
 
+@dataclass(slots=True)
+class PairSummary:
+    """The Dexscreener pair fields enrichment uses, parsed once per response"""
+    pair_address: str  # lowercase
+    base_address: str  # lowercase
+    liquidity_usd: float
+    volume_24h: float
+    price_usd: float
+    price_change_24h: float
+    market_cap: float
+    dex: str
+
+    @classmethod
+    def from_pair(cls, pair: Dict) -> 'PairSummary':
+        # Nested objects and values can be missing or null for new pairs
+        get = pair.get
+        liquidity = get('liquidity') or {}
+        volume = get('volume') or {}
+        price_change = get('priceChange') or {}
+        return cls(
+            pair_address=(get('pairAddress') or '').lower(),
+            base_address=((get('baseToken') or {}).get('address') or '').lower(),
+            liquidity_usd=float(liquidity.get('usd') or 0),
+            volume_24h=float(volume.get('h24') or 0),
+            price_usd=float(get('priceUsd') or 0),
+            price_change_24h=float(price_change.get('h24') or 0),
+            market_cap=float(get('marketCap') or 0),
+            # Dexscreener holders data can be unreliable, so it is not used
+            dex=sys.intern(get('dexId') or 'unknown'),
+        )
+
+
+_by_liquidity = operator.attrgetter('liquidity_usd')
+
+
+def _summarize_pair(pair: Dict) -> Optional[PairSummary]:
+    """PairSummary for a raw pair, or None if its numbers don't parse"""
+    try:
+        return PairSummary.from_pair(pair)
+    except (TypeError, ValueError):
+        return None
+
+
+def _encode_token_jsonl(token_data: Dict) -> bytes:
+    """One token_queue.json line"""
+    return _json_dumps(token_data) + b'\n'
+
+
+def _encode_token_msgpack(token_data: Dict) -> bytes:
+    """One length-prefixed token_queue.msgpack record"""
+    buf = msgpack.packb(token_data, use_bin_type=True, default=str)
+    return len(buf).to_bytes(4, 'little') + buf
+
+
+def _hash_alert_key(text: str) -> int:
+    """64-bit dedup key for a "<chain>_<address>" string"""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'big')
+
+
+def _parse_alert_key(value) -> int:
+    """Stored key as int; older files hold the plain "<chain>_<address>" strings"""
+    if isinstance(value, int):
+        return value
+    return int(value) if value.isdigit() else _hash_alert_key(value)
+
+
+class BoundedKeySet:
+    """Set of keys that forgets the oldest once it holds more than maxlen"""
+
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._keys: OrderedDict = OrderedDict()
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def add(self, key):
+        keys = self._keys
+        keys[key] = None
+        if len(keys) > self.maxlen:
+            keys.popitem(last=False)
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def clear(self):
+        self._keys.clear()
+
+
 class UnifiedMonitor:
     """Main orchestrator for multi-chain token monitoring"""
 
@@ -88,6 +271,26 @@ class UnifiedMonitor:
         self.high_confidence_threshold = int(os.getenv('HIGH_CONFIDENCE_THRESHOLD', 75))
         self.medium_confidence_threshold = int(os.getenv('MEDIUM_CONFIDENCE_THRESHOLD', 60))
         self.minimum_alert_score = int(os.getenv('MINIMUM_ALERT_SCORE', 60))
+        # (min score, heap priority, priority, stats counter), highest first;
+        # the low tier's -inf catches every score
+        self._priority_table = (
+            (self.high_confidence_threshold, 0, 'high', 'high_confidence_alerts'),
+            (self.medium_confidence_threshold, 1, 'medium', 'medium_confidence_alerts'),
+            (float('-inf'), 2, 'low', 'low_confidence_alerts'),
+        )
+        # Queued/held alerts older than this are dropped instead of sent
+        self.alert_max_age = float(os.getenv('ALERT_MAX_AGE_HOURS', 24)) * 3600
+
+        # Epoch time of the next local midnight, when daily quotas reset
+        self._next_reset_epoch = self._compute_next_midnight_epoch()
+
+        # Overall alert send rate; defaults to TelegramDispatcher's global
+        # bucket. Per-chat pacing comes from send_alert, which waits while the
+        # alert's chat is backlogged, so the heap keeps deciding send order.
+        self._alert_bucket = TokenBucket(
+            rate=float(os.getenv('ALERT_RATE_PER_SECOND', os.getenv('TELEGRAM_GLOBAL_RATE', 25))),
+            capacity=float(os.getenv('ALERT_BURST', os.getenv('TELEGRAM_GLOBAL_BURST', 30)))
+        )
 
         # Chain enabled flags
         self.chain_enabled = {
@@ -105,19 +308,76 @@ class UnifiedMonitor:
             'base': int(os.getenv('BASE_ALERT_PERCENTAGE', 5))
         }
 
-        # --- FIXED: Use efficient PriorityQueue and persist sent_alerts ---
+        # --- FIXED: Use an efficient priority heap and persist sent_alerts ---
         self.sent_alerts_file = "sent_alerts.json"
-        self.sent_alerts: Set[str] = self._load_sent_alerts()
-        self.alert_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        # Append-only log of keys sent since the last snapshot
+        self.sent_alerts_log_file = "sent_alerts.log"
+        # Upper bound on remembered keys, in case the daily reset never runs
+        self.sent_alerts_max = int(os.getenv('SENT_ALERTS_MAX', 200_000))
+        self.sent_alerts: BoundedKeySet = self._load_sent_alerts()
+        self._sent_alerts_log = open(self.sent_alerts_log_file, 'a', buffering=1)
+        self._sends_since_compact = 0
+        # Alert priority heap; dispatch_alerts is its only consumer and
+        # waits on _alert_event when it is empty
+        self._alert_heap: List[Tuple] = []
+        self._alert_event = asyncio.Event()
+        self._alert_seq = itertools.count()
         
-        # Holds alerts if quotas are full, to be re-queued later
+        # Holds alerts if quotas are full, to be re-queued later.
+        # Kept as a heapq so re-queuing releases the best alerts first.
         self.holding_queue: List[Tuple] = [] 
         # ---
 
+        # Raw (chain, token_data) discoveries, processed by a worker pool so a
+        # slow enrichment doesn't stall a chain's stream; the bound applies
+        # back-pressure to the monitors. Enough workers by default that a
+        # burst can fill a whole Dexscreener batch.
+        self._discovery_q: asyncio.Queue = asyncio.Queue(maxsize=1024)
+        self.enrich_workers = int(os.getenv('ENRICH_WORKERS', DEXSCREENER_BATCH_SIZE))
+
+        # Keys of alerts being enriched/scored or waiting in the alert/holding
+        # heaps; rediscoveries of these are skipped before any network call
+        self._in_flight: Set[int] = set()
+        # Alerts handed to Telegram, waiting to be confirmed before their
+        # keys are persisted (see _confirm_delivery)
+        self._delivery_tasks: Set[asyncio.Task] = set()
+
+        # Serialized token_queue.json lines waiting for the batch writer
+        self._file_write_queue: asyncio.Queue = asyncio.Queue()
+        self._token_queue_fh = None
+
+        # The Rust bot reads JSON lines; msgpack is opt-in until it can read that too
+        token_queue_format = os.getenv('TOKEN_QUEUE_FORMAT', 'json').lower()
+        if token_queue_format == 'msgpack' and msgpack is None:
+            logger.warning("TOKEN_QUEUE_FORMAT=msgpack but msgpack is not installed; using json")
+            token_queue_format = 'json'
+        if token_queue_format == 'msgpack':
+            self._token_queue_path = TOKEN_QUEUE_MSGPACK_FILE
+            self._encode_token_record = _encode_token_msgpack
+        else:
+            self._token_queue_path = TOKEN_QUEUE_FILE
+            self._encode_token_record = _encode_token_jsonl
+
         # Initialize components
         self.scorer = TokenScorer()
         self.telegram = TelegramDispatcher()
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[httpx.AsyncClient] = None
+
+        # Queues of (address, future) feeding _enrichment_batcher, keyed by
+        # (endpoint kind, ds_chain)
+        self._enrich_queues: Dict[Tuple[str, str], asyncio.Queue] = {}
+        self._enrich_tasks: List[asyncio.Task] = []
+        # Upper bound (seconds) on gathering one batch; lookups that arrive
+        # while a request is in flight form the next batch
+        self.dexscreener_batch_window = float(os.getenv('DEXSCREENER_BATCH_WINDOW', 0.2))
+
+        # Monotonic times of recent Dexscreener failures, for the circuit breaker
+        self._dex_failures: deque = deque()
+        self._dex_circuit_open_until = 0.0
+
+        # (ds_chain, address) -> (expires_at monotonic, pairs), oldest first
+        self._enrich_cache: Dict[Tuple[str, str], Tuple[float, List[PairSummary]]] = {}
+        self._enrich_cache_pruned_at = time.monotonic()
 
         # Initialize only enabled chain monitors
         self.monitors = {}
@@ -132,7 +392,12 @@ class UnifiedMonitor:
 
         # Chain-specific alert quotas
         self.chain_quotas = self._calculate_chain_quotas()
-        self.chain_alerts_sent = defaultdict(int)
+
+        # Flat per-chain counters for the dispatch loop, indexed by chain id
+        self._chain_ids: Dict[str, int] = {chain: i for i, chain in enumerate(self.chain_quotas)}
+        self._chain_quota_arr = array.array('i', self.chain_quotas.values())
+        self._chain_alerts_sent = array.array('i', [0]) * len(self._chain_ids)
+        self._chain_discovered = array.array('q', [0]) * len(self._chain_ids)
 
         logger.info(f"Unified Monitor initialized with daily target: {self.daily_alert_target} alerts")
         logger.info(f"Enabled chains: {[chain for chain, enabled in self.chain_enabled.items() if enabled]}")
@@ -141,29 +406,76 @@ class UnifiedMonitor:
         logger.info(f"Loaded {len(self.sent_alerts)} sent alerts from {self.sent_alerts_file}")
 
     # --- ADDED: Persistence for sent_alerts ---
-    def _load_sent_alerts(self) -> Set[str]:
-        """Load the set of sent alert keys from a file"""
-        if not os.path.exists(self.sent_alerts_file):
-            return set()
-        try:
-            with open(self.sent_alerts_file, 'r') as f:
-                data = json.load(f)
-                return set(data)
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning(f"Could not load sent_alerts.json, starting fresh: {e}")
-            return set()
+    def _load_sent_alerts(self) -> BoundedKeySet:
+        """Load sent alert keys from the JSON snapshot plus the append-only log"""
+        sent_alerts = BoundedKeySet(self.sent_alerts_max)
+        if os.path.exists(self.sent_alerts_file):
+            try:
+                with open(self.sent_alerts_file, 'rb') as f:
+                    data = _json_loads(f.read())
+                # Older snapshots are a bare list with no date
+                if isinstance(data, dict):
+                    if data.get('date') != datetime.now().date().isoformat():
+                        # Dedup is per day (see the daily reset in dispatch_alerts);
+                        # drop a previous day's keys so the set stays bounded by
+                        # daily_alert_target across restarts.
+                        logger.info(f"Discarding sent alerts from {data.get('date')}")
+                        for path in (self.sent_alerts_file, self.sent_alerts_log_file):
+                            if os.path.exists(path):
+                                os.remove(path)
+                        return sent_alerts
+                    data = data.get('keys', [])
+                sent_alerts.update(map(_parse_alert_key, data))
+            except (json.JSONDecodeError, IOError) as e:
+                logger.warning(f"Could not load sent_alerts.json, starting fresh: {e}")
+
+        if os.path.exists(self.sent_alerts_log_file):
+            try:
+                with open(self.sent_alerts_log_file, 'r') as f:
+                    sent_alerts.update(_parse_alert_key(line.strip()) for line in f if line.strip())
+            except IOError as e:
+                logger.warning(f"Could not read sent_alerts.log: {e}")
+
+        return sent_alerts
 
     def _save_sent_alerts(self):
-        """Save the set of sent alert keys to a file"""
-        # This is blocking, but should be fast. 
-        # For ultra-high performance, this could also be run in a thread.
+        """Write the full snapshot of sent alert keys and truncate the log"""
+        # Blocking; call through asyncio.to_thread from the event loop
         try:
-            with open(self.sent_alerts_file, 'w') as f:
-                json.dump(list(self.sent_alerts), f)
+            snapshot = {
+                'date': self.stats.last_alert_reset.date().isoformat(),
+                'keys': list(self.sent_alerts)
+            }
+            with open(self.sent_alerts_file, 'wb') as f:
+                f.write(_json_dumps(snapshot))
+            self._sent_alerts_log.truncate(0)
         except IOError as e:
             logger.error(f"Failed to save sent_alerts.json: {e}")
+
+    async def _record_sent_alert(self, alert_key: int):
+        """Mark an alert as sent, appending its key to the log"""
+        self.sent_alerts.add(alert_key)
+        try:
+            await asyncio.to_thread(self._sent_alerts_log.write, f"{alert_key}\n")
+        except (IOError, ValueError) as e:
+            logger.error(f"Failed to append to sent_alerts.log: {e}")
+
+        self._sends_since_compact += 1
+        if self._sends_since_compact >= SENT_ALERTS_COMPACT_EVERY:
+            await self._compact_sent_alerts()
+
+    async def _compact_sent_alerts(self):
+        """Fold the append-only log into the JSON snapshot"""
+        await asyncio.to_thread(self._save_sent_alerts)
+        self._sends_since_compact = 0
     # ---
 
+    @staticmethod
+    def _compute_next_midnight_epoch() -> float:
+        """Return the epoch timestamp of the next local midnight"""
+        tomorrow = datetime.now().date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
     def _calculate_chain_quotas(self) -> Dict[str, int]:
         """Calculate daily alert quotas per chain"""
         quotas = {}
@@ -171,40 +483,49 @@ class UnifiedMonitor:
             quotas[chain] = int(self.daily_alert_target * percentage / 100)
         return quotas
 
-    def _get_alert_key(self, token_data: Dict) -> str:
+    def _get_alert_key(self, token_data: Dict) -> int:
         """Generate unique key for alert deduplication"""
+        # Hashed to a 64-bit int: cheap to hash and compact in sent_alerts
         # Use token address as primary key, fallback to pair address
         address = token_data.get('address', token_data.get('new_token'))
         if address:
-            return f"{token_data.get('chain')}_{address}"
+            return _hash_alert_key(f"{token_data.get('chain')}_{address}")
         
         # Fallback for systems that only provide pair
         pair_address = token_data.get('pair_address', token_data.get('pool_address'))
-        return f"{token_data.get('chain')}_{pair_address}"
+        return _hash_alert_key(f"{token_data.get('chain')}_{pair_address}")
 
     async def process_token_discovery(self, token_data: Dict, chain: str):
         """Process a newly discovered token"""
+        claimed_key = None # Alert key this call added to _in_flight
+        queued = False
         try:
-            # Add chain info
-            token_data['chain'] = chain
+            # Add chain info (interned: used as a key in the per-chain dicts)
+            token_data['chain'] = chain = sys.intern(chain)
+            # One clock read per discovery, for the timestamp and the alert expiry
+            now_ns = time.time_ns()
             if 'discovered_at' not in token_data:
-                token_data['discovered_at'] = datetime.now().isoformat()
+                # Formatted lazily in dispatch_alerts, only for tokens that get sent
+                token_data['discovered_at_ns'] = now_ns
 
             # Generate unique key
             alert_key = self._get_alert_key(token_data)
 
-            # Check if already sent
-            if alert_key in self.sent_alerts:
+            # Check if already sent, or already being processed/queued
+            if alert_key in self.sent_alerts or alert_key in self._in_flight:
                 return
+            self._in_flight.add(alert_key)
+            claimed_key = alert_key
 
             # Enrich token data with market info
             enriched_data = await self.enrich_token_data(token_data)
 
             # Debug: Log enrichment results
-            logger.debug(f"Enriched data - Liquidity: ${enriched_data.get('liquidity_usd', 0):,.0f}, "
-                         f"Volume: ${enriched_data.get('volume_24h', 0):,.0f}, "
-                         f"Holders: {enriched_data.get('holders', 0)}, "
-                         f"MarketCap: ${enriched_data.get('market_cap', 0):,.0f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Enriched data - Liquidity: ${enriched_data.get('liquidity_usd', 0):,.0f}, "
+                             f"Volume: ${enriched_data.get('volume_24h', 0):,.0f}, "
+                             f"Holders: {enriched_data.get('holders', 0)}, "
+                             f"MarketCap: ${enriched_data.get('market_cap', 0):,.0f}")
 
             # Score the token
             score, analysis = await self.scorer.score_token(enriched_data)
@@ -213,55 +534,115 @@ class UnifiedMonitor:
 
             # Update statistics
             self.stats.tokens_discovered += 1
-            self.stats.chain_stats[chain] = self.stats.chain_stats.get(chain, 0) + 1
+            self._chain_discovered[self._chain_ids[chain]] += 1
 
             # Determine alert priority
-            if score >= self.high_confidence_threshold:
-                priority = 'high'
-                self.stats.high_confidence_alerts += 1
-            elif score >= self.medium_confidence_threshold:
-                priority = 'medium'
-                self.stats.medium_confidence_alerts += 1
-            else:
-                priority = 'low'
-                self.stats.low_confidence_alerts += 1
+            stats = self.stats
+            for threshold, priority_num, priority, counter in self._priority_table:
+                if score >= threshold:
+                    setattr(stats, counter, getattr(stats, counter) + 1)
+                    break
 
-            # --- FIXED: Use PriorityQueue ---
+            # --- FIXED: Use the priority heap ---
             # Add to queue if meets threshold
             if score >= self.minimum_alert_score:
-                priority_num = 0 if priority == 'high' else 1 if priority == 'medium' else 2
-                
                 # We use -score so a higher score has a higher priority (lower number)
-                # We add datetime for tie-breaking
+                # A sequence number breaks ties (FIFO) and is always unique, so
+                # the heap never falls through to comparing the alert dicts
                 alert_tuple = (
                     priority_num,
                     -score,
-                    datetime.now(),
-                    {'token_data': enriched_data, 'priority': priority}
+                    next(self._alert_seq),
+                    {'token_data': enriched_data, 'priority': priority, 'alert_key': alert_key,
+                     'expires_at': now_ns / 1e9 + self.alert_max_age}
                 )
-                await self.alert_queue.put(alert_tuple)
-
-            # --- FIXED: Non-blocking file I/O ---
-            # Write to file for Rust bot
-            # This uses asyncio.to_thread to run the blocking file I/O
-            # in a separate thread, not blocking the main async loop.
-            # Requires Python 3.9+
-            def write_data_to_file():
-                try:
-                    with open('token_queue.json', 'a') as f:
-                        json.dump(enriched_data, f)
-                        f.write('\n')
-                except Exception as e:
-                    logger.error(f"Failed to write to token_queue.json: {e}")
+                self._enqueue_alert(alert_tuple)
+                queued = True
 
-            await asyncio.to_thread(write_data_to_file)
+            # Queue the line for the Rust bot; _token_file_writer batches
+            # the actual file I/O off the event loop
+            try:
+                self._file_write_queue.put_nowait(self._encode_token_record(enriched_data))
+            except Exception as e:
+                logger.error("Failed to serialize for token_queue.json: %s", e)
 
-            logger.info(f"Token discovered on {chain}: {enriched_data.get('symbol', 'Unknown')} "
-                        f"(Score: {score}, Priority: {priority})")
+            logger.info("Token discovered on %s: %s (Score: %s, Priority: %s)",
+                        chain, enriched_data.get('symbol', 'Unknown'), score, priority)
 
         except Exception as e:
             logger.error(f"Error processing token discovery: {e}", exc_info=True)
             self.stats.errors += 1
+        finally:
+            # A queued alert stays in flight until dispatch sends or drops it
+            if claimed_key is not None and not queued:
+                self._in_flight.discard(claimed_key)
+
+    def _open_token_queue(self):
+        """(Re)open token_queue.json for appending"""
+        if self._token_queue_fh:
+            self._token_queue_fh.close()
+        self._token_queue_fh = open(self._token_queue_path, 'ab')
+
+    def _token_queue_replaced(self) -> bool:
+        """True if token_queue.json no longer refers to our open handle"""
+        try:
+            return os.stat(self._token_queue_path).st_ino != os.fstat(self._token_queue_fh.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _flush_token_batch(self, batch: List[bytes]):
+        """Append a batch of serialized tokens to token_queue.json"""
+        try:
+            if fcntl is None:
+                if self._token_queue_fh is None or self._token_queue_replaced():
+                    self._open_token_queue()
+                self._token_queue_fh.writelines(batch)
+                self._token_queue_fh.flush()
+                return
+
+            # The Rust bot consumes the queue under an exclusive flock and
+            # renames a rewritten copy over it, so take the same lock and
+            # reopen whenever the path has been replaced under us.
+            while True:
+                if self._token_queue_fh is None or self._token_queue_replaced():
+                    self._open_token_queue()
+                fcntl.flock(self._token_queue_fh, fcntl.LOCK_EX)
+                if not self._token_queue_replaced():
+                    break
+                fcntl.flock(self._token_queue_fh, fcntl.LOCK_UN)
+
+            try:
+                self._token_queue_fh.writelines(batch)
+                self._token_queue_fh.flush()
+            finally:
+                fcntl.flock(self._token_queue_fh, fcntl.LOCK_UN)
+        except Exception as e:
+            logger.error(f"Failed to write to token_queue.json: {e}")
+
+    async def _token_file_writer(self):
+        """Drain queued tokens to token_queue.json, one thread hop per batch"""
+        loop = asyncio.get_running_loop()
+        while self.running or not self._file_write_queue.empty():
+            try:
+                batch = [await asyncio.wait_for(self._file_write_queue.get(), timeout=5.0)]
+            except asyncio.TimeoutError:
+                continue
+
+            # Give a burst of discoveries a moment to land in the same flush
+            deadline = loop.time() + TOKEN_QUEUE_BATCH_WINDOW
+            while len(batch) < TOKEN_QUEUE_BATCH_SIZE:
+                if self._file_write_queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0 or not self.running:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._file_write_queue.get(), timeout=timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._file_write_queue.get_nowait())
+
+            await asyncio.to_thread(self._flush_token_batch, batch)
 
     async def enrich_token_data(self, token_data: Dict) -> Dict:
         """Enrich token data with information from Dexscreener"""
@@ -271,136 +652,420 @@ class UnifiedMonitor:
             
             # Get pair/pool address
             pair_address = token_data.get('pair_address') or token_data.get('pool_address')
-            
-            # Solana often uses the token mint address as the "pair"
-            if not pair_address and token_data['chain'] == 'solana':
-                 pair_address = token_data.get('address') # 'address' is the mint
+            token_address = (token_data.get('new_token') or token_data.get('mint_address')
+                             or token_data.get('address'))
+
+            # Chain names are already lowercase; only lower() on a miss
+            chain = token_data['chain']
+            ds_chain = _DS_CHAIN_MAP(chain) or _DS_CHAIN_MAP(chain.lower(), chain)
 
-            if not pair_address:
-                logger.debug(f"No pair/pool address found for token: {token_data.get('symbol', 'Unknown')}")
+            lookup_address = token_address or pair_address
+            if not lookup_address:
+                logger.debug("No token or pair address found for token: %s", token_data.get('symbol', 'Unknown'))
                 return token_data
 
-            chain_map = {"bnb": "bsc", "solana": "solana", "ethereum": "ethereum", "base": "base"}
-            ds_chain = chain_map.get(token_data['chain'].lower(), token_data['chain'])
-            url = f"{DEXSCREENER_API}/pairs/{ds_chain}/{pair_address}"
-            async with self.session.get(url) as response:
+            cache_key = (ds_chain, lookup_address)
+            now = time.monotonic()
+            cached = self._enrich_cache.get(cache_key)
+            if cached and now < cached[0]:
+                pairs = cached[1]
+            else:
+                # Coalesced with other lookups on this chain (see _enrichment_batcher)
+                if token_address:
+                    pairs = await self._queue_lookup('tokens', ds_chain, token_address)
+                else:
+                    pairs = await self._queue_lookup('pairs', ds_chain, pair_address)
+
+                if pairs is not None:
+                    self._cache_pairs(cache_key, pairs)
+
+            if pairs:
+                # --- FIXED: Smarter pair selection ---
+                best_pair = None
+                target_base_token = token_data.get('base_token', '').lower()
+
+                # Prefer the exact pool the monitor discovered
+                if pair_address:
+                    target_pair = pair_address.lower()
+                    for pair in pairs:
+                        if pair.pair_address == target_pair:
+                            best_pair = pair
+                            break
+
+                # /tokens/v1 results include pairs where the token is the
+                # quote side; only consider pairs that price our token
+                if not best_pair and token_address:
+                    target_token = token_address.lower()
+                    own_pairs = [pair for pair in pairs if pair.base_address == target_token]
+                    if own_pairs:
+                        pairs = own_pairs
+
+                if not best_pair and target_base_token:
+                    for pair in pairs:
+                        if pair.base_address == target_base_token:
+                            best_pair = pair
+                            break # Found the exact pair
                 
-                # --- ADDED: Rate limit check ---
-                if response.status == 429:
-                    logger.warning(f"Dexscreener rate limit hit. Skipping enrichment for {pair_address}")
-                    return token_data
+                # Fallback: if no exact match, use the one with most liquidity
+                # (first pair if none report any)
+                if not best_pair:
+                    best_pair = max(pairs, key=_by_liquidity)
+                # ---
                 
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # --- FIXED: Smarter pair selection ---
-                    if data.get('pairs'):
-                        best_pair = None
-                        target_base_token = token_data.get('base_token', '').lower()
-
-                        if target_base_token:
-                            for pair in data['pairs']:
-                                base_addr = pair.get('baseToken', {}).get('address', '').lower()
-                                if base_addr == target_base_token:
-                                    best_pair = pair
-                                    break # Found the exact pair
-                        
-                        # Fallback: if no exact match, use the one with most liquidity
-                        if not best_pair:
-                            best_pair = max(data['pairs'], key=lambda p: float(p.get('liquidity', {}).get('usd', 0)))
-
-                        pair_data = best_pair
-                        # ---
-                        
-                        token_data['liquidity_usd'] = float(pair_data.get('liquidity', {}).get('usd', 0))
-                        token_data['volume_24h'] = float(pair_data.get('volume', {}).get('h24', 0))
-                        token_data['price_usd'] = float(pair_data.get('priceUsd', 0))
-                        token_data['price_change_24h'] = float(pair_data.get('priceChange', {}).get('h24', 0))
-                        token_data['market_cap'] = float(pair_data.get('marketCap', 0))
-                        # Dexscreener holders data can be unreliable, use with caution
-                        # token_data['holders'] = int(pair_data.get('holders', 0))
-                        token_data['dex'] = pair_data.get('dexId', 'unknown')
-                else:
-                    logger.debug(f"Dexscreener API error {response.status} for {pair_address}")
+                token_data.update(
+                    liquidity_usd=best_pair.liquidity_usd,
+                    volume_24h=best_pair.volume_24h,
+                    price_usd=best_pair.price_usd,
+                    price_change_24h=best_pair.price_change_24h,
+                    market_cap=best_pair.market_cap,
+                    dex=best_pair.dex,
+                )
 
         except Exception as e:
             logger.error(f"Error enriching token data: {e}", exc_info=True)
         
         return token_data
 
+    def _cache_pairs(self, cache_key: Tuple[str, str], pairs: List[PairSummary]):
+        """Store a Dexscreener response; expired entries are swept at most once per TTL"""
+        now = time.monotonic()
+        cache = self._enrich_cache
+        ttl = ENRICH_CACHE_TTL if pairs else ENRICH_NEGATIVE_CACHE_TTL
+        cache.pop(cache_key, None) # Re-insert at the end to keep age order
+        cache[cache_key] = (now + ttl, pairs)
+
+        if now - self._enrich_cache_pruned_at >= ENRICH_CACHE_TTL:
+            cache = {key: entry for key, entry in cache.items() if entry[0] > now}
+            self._enrich_cache = cache
+            self._enrich_cache_pruned_at = now
+
+        # Over capacity: the dict is in insertion order, so drop the oldest
+        while len(cache) > ENRICH_CACHE_MAX:
+            del cache[next(iter(cache))]
+
+    def _record_dex_failure(self):
+        """Count a failed Dexscreener call; trip the breaker if too many are recent"""
+        now = time.monotonic()
+        failures = self._dex_failures
+        failures.append(now)
+        while failures[0] <= now - DEXSCREENER_BREAKER_WINDOW:
+            failures.popleft()
+
+        if len(failures) >= DEXSCREENER_BREAKER_FAILURES:
+            logger.warning(f"Dexscreener failing ({len(failures)} errors in {DEXSCREENER_BREAKER_WINDOW:.0f}s). "
+                           f"Pausing enrichment for {DEXSCREENER_BREAKER_COOLDOWN:.0f}s")
+            self._dex_circuit_open_until = now + DEXSCREENER_BREAKER_COOLDOWN
+            failures.clear()
+
+    async def _dex_get(self, url: str) -> Optional[httpx.Response]:
+        """GET a Dexscreener URL, retrying 429/5xx with backoff.
+
+        Returns None while the circuit breaker is open or if every attempt
+        failed at the network level; otherwise the last response.
+        """
+        if time.monotonic() < self._dex_circuit_open_until:
+            return None
+
+        response = None
+        for attempt in range(DEXSCREENER_MAX_TRIES):
+            try:
+                response = await self.session.get(url)
+            except httpx.HTTPError as e:
+                logger.debug("Dexscreener request failed: %s", e)
+                response = None
+            else:
+                if response.status_code != 429 and response.status_code < 500:
+                    return response
+
+            self._record_dex_failure()
+            if attempt == DEXSCREENER_MAX_TRIES - 1 or time.monotonic() < self._dex_circuit_open_until:
+                break
+
+            # Honour Retry-After (seconds form) when given, else jittered exponential backoff
+            retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+            if retry_after.isdigit():
+                delay = min(DEXSCREENER_BACKOFF_CAP, float(retry_after))
+            else:
+                delay = min(DEXSCREENER_BACKOFF_CAP, 0.5 * 2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, 0.3))
+
+        return response
+
+    async def _fetch_pair(self, ds_chain: str, pair_address: str) -> Optional[List[PairSummary]]:
+        """Look up a single pair; returns its pairs list or None on failure"""
+        url = f"{DEXSCREENER_API}/pairs/{ds_chain}/{pair_address}"
+        response = await self._dex_get(url)
+
+        if response is None:
+            return None
+
+        # --- ADDED: Rate limit check ---
+        if response.status_code == 429:
+            logger.warning("Dexscreener rate limit hit. Skipping enrichment for %s", pair_address)
+            return None
+
+        if response.status_code != 200:
+            logger.debug("Dexscreener API error %s for %s", response.status_code, pair_address)
+            return None
+
+        pairs = map(_summarize_pair, _json_loads(response.content).get('pairs') or [])
+        return [pair for pair in pairs if pair]
+
+    async def _queue_lookup(self, kind: str, ds_chain: str, address: str) -> Optional[List[PairSummary]]:
+        """Queue a token ('tokens') or pair ('pairs') address for its batcher and wait for the pairs"""
+        queue = self._enrich_queues.get((kind, ds_chain))
+        if queue is None:
+            queue = self._enrich_queues[(kind, ds_chain)] = asyncio.Queue()
+            fetch = self._fetch_token_batch if kind == 'tokens' else self._fetch_pair_batch
+            self._enrich_tasks.append(asyncio.create_task(self._enrichment_batcher(ds_chain, queue, fetch)))
+
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((address, future))
+        return await future
+
+    async def _enrichment_batcher(self, ds_chain: str, queue: asyncio.Queue, fetch):
+        """Collect the lookups already waiting (up to DEXSCREENER_BATCH_SIZE) into one request"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.dexscreener_batch_window
+            while len(batch) < DEXSCREENER_BATCH_SIZE and loop.time() < deadline:
+                if queue.empty():
+                    # Let lookups started in the same loop iteration join,
+                    # then flush rather than holding the first one back
+                    await asyncio.sleep(0)
+                    if queue.empty():
+                        break
+                batch.append(queue.get_nowait())
+
+            await fetch(ds_chain, batch)
+
+    async def _fetch_token_batch(self, ds_chain: str, batch: List[Tuple[str, asyncio.Future]]):
+        """Fetch pairs for a batch of tokens in one request and resolve each waiter"""
+        pairs_by_token = None
+        addresses = list(dict.fromkeys(address for address, _ in batch))
+        try:
+            url = f"{DEXSCREENER_TOKENS_API}/{ds_chain}/{','.join(addresses)}"
+            response = await self._dex_get(url)
+
+            if response is None:
+                logger.debug("Dexscreener unavailable, skipping %d tokens", len(addresses))
+            elif response.status_code == 429:
+                logger.warning("Dexscreener rate limit hit. Skipping enrichment for %d tokens", len(addresses))
+            elif response.status_code != 200:
+                logger.debug("Dexscreener API error %s for %d tokens", response.status_code, len(addresses))
+            else:
+                # The endpoint returns a flat list of pairs; index them by both sides
+                pairs_by_token = defaultdict(list)
+                for pair in _json_loads(response.content) or []:
+                    summary = _summarize_pair(pair)
+                    if summary is None:
+                        continue
+                    for side in ('baseToken', 'quoteToken'):
+                        address = ((pair.get(side) or {}).get('address') or '').lower()
+                        if address:
+                            pairs_by_token[address].append(summary)
+        except Exception as e:
+            logger.error(f"Error fetching Dexscreener batch: {e}")
+        finally:
+            for address, future in batch:
+                if not future.done():
+                    future.set_result(
+                        None if pairs_by_token is None else pairs_by_token.get(address.lower(), [])
+                    )
+
+    async def _fetch_pair_batch(self, ds_chain: str, batch: List[Tuple[str, asyncio.Future]]):
+        """Fetch a batch of pairs in one /pairs request and resolve each waiter"""
+        pairs_by_address = None
+        addresses = list(dict.fromkeys(address for address, _ in batch))
+        try:
+            if len(addresses) == 1:
+                pairs = await self._fetch_pair(ds_chain, addresses[0])
+                if pairs is not None:
+                    pairs_by_address = {addresses[0].lower(): pairs}
+            else:
+                url = f"{DEXSCREENER_API}/pairs/{ds_chain}/{','.join(addresses)}"
+                response = await self._dex_get(url)
+
+                if response is None:
+                    logger.debug("Dexscreener unavailable, skipping %d pairs", len(addresses))
+                elif response.status_code == 429:
+                    logger.warning("Dexscreener rate limit hit. Skipping enrichment for %d pairs", len(addresses))
+                elif response.status_code != 200:
+                    logger.debug("Dexscreener API error %s for %d pairs", response.status_code, len(addresses))
+                else:
+                    pairs_by_address = defaultdict(list)
+                    for pair in _json_loads(response.content).get('pairs') or []:
+                        summary = _summarize_pair(pair)
+                        if summary and summary.pair_address:
+                            pairs_by_address[summary.pair_address].append(summary)
+        except Exception as e:
+            logger.error(f"Error fetching Dexscreener pair batch: {e}")
+        finally:
+            for address, future in batch:
+                if not future.done():
+                    future.set_result(
+                        None if pairs_by_address is None else pairs_by_address.get(address.lower(), [])
+                    )
+
+    def _enqueue_alert(self, alert_tuple: Tuple):
+        """Queue an alert for dispatch_alerts"""
+        heapq.heappush(self._alert_heap, alert_tuple)
+        self._alert_event.set()
+
+    def _push_hold(self, alert_tuple: Tuple):
+        """Hold an alert until quota is available"""
+        heapq.heappush(self.holding_queue, alert_tuple)
+
+    def _drain_hold(self) -> int:
+        """Re-queue held alerts in priority order, returning how many moved.
+
+        Single pass over the heap: only as many alerts as the daily and
+        per-chain quotas still have room for are released, the rest stay held.
+        """
+        now = time.time()
+        daily_room = self.daily_alert_target - self.stats.alerts_sent_today
+        chain_room = array.array('i', (
+            quota - sent for quota, sent in zip(self._chain_quota_arr, self._chain_alerts_sent)
+        ))
+
+        kept = []
+        requeued = 0
+        while self.holding_queue and daily_room > 0:
+            alert_tuple = heapq.heappop(self.holding_queue)
+            alert = alert_tuple[3]
+            if alert['alert_key'] in self.sent_alerts or alert['expires_at'] <= now:
+                # Duplicate of an alert sent since it was held, or too old to send
+                self._in_flight.discard(alert['alert_key'])
+                continue
+            cid = self._chain_ids[alert_tuple[3]['token_data']['chain']]
+            if chain_room[cid] <= 0:
+                kept.append(alert_tuple)
+                continue
+            chain_room[cid] -= 1
+            daily_room -= 1
+            self._enqueue_alert(alert_tuple)
+            requeued += 1
+
+        if self.holding_queue:
+            # Stopped early on the daily quota; merge what was never popped
+            kept.extend(self.holding_queue)
+            heapq.heapify(kept)
+        # Otherwise everything was popped in order, so kept is already a heap
+        self.holding_queue = kept
+        return requeued
+
+    async def _periodic_hold_drain(self):
+        """Retry held alerts (e.g. failed sends) once their quota has room"""
+        while self.running:
+            await asyncio.sleep(60)
+            if self.holding_queue and self.stats.alerts_sent_today < self.daily_alert_target:
+                requeued = self._drain_hold()
+                if requeued:
+                    logger.info(f"Re-queued {requeued} held alerts")
+
     # --- FIXED: Complete rewrite of dispatch_alerts ---
     async def dispatch_alerts(self):
-        """Dispatch alerts based on quotas and priorities from the PriorityQueue"""
+        """Dispatch alerts based on quotas and priorities from the alert heap"""
+        # Bind loop-invariant attributes once; these objects are only ever
+        # mutated in place (cleared/reset), never reassigned.
+        stats = self.stats
+        sent_alerts = self.sent_alerts
+        chain_ids = self._chain_ids
+        chain_quotas = self._chain_quota_arr
+        chain_alerts_sent = self._chain_alerts_sent
+        no_alerts_sent = array.array('i', [0]) * len(chain_alerts_sent)
+        daily_target = self.daily_alert_target
+        alert_heap = self._alert_heap
+        alert_event = self._alert_event
+        in_flight = self._in_flight
+        heappop = heapq.heappop
+
         while self.running:
             try:
-                # Reset daily stats if needed
-                if datetime.now().date() > self.stats.last_alert_reset.date():
-                    self.stats.reset_daily_stats()
-                    self.chain_alerts_sent.clear()
-                    self.sent_alerts.clear() # Clear in-memory, file will be overwritten
-                    self._save_sent_alerts()
+                # Reset daily stats if needed. One wall-clock read serves the
+                # reset and expiry checks unless we had to wait for an alert.
+                now = time.time()
+                if now >= self._next_reset_epoch:
+                    self._next_reset_epoch = self._compute_next_midnight_epoch()
+                    stats.reset_daily_stats()
+                    chain_alerts_sent[:] = no_alerts_sent
+                    sent_alerts.clear() # Clear in-memory, file will be overwritten
+                    await self._compact_sent_alerts()
                     
                     # --- ADDED: Re-queue held alerts ---
                     logger.info(f"Daily reset: Re-queuing {len(self.holding_queue)} held alerts.")
-                    for alert_tuple in self.holding_queue:
-                        await self.alert_queue.put(alert_tuple)
-                    self.holding_queue.clear()
+                    self._drain_hold()
                     # ---
 
-                try:
-                    # Get highest priority item, wait max 5s if queue is empty
-                    alert_tuple = await asyncio.wait_for(self.alert_queue.get(), timeout=5.0)
-                    # alert_tuple is (priority_num, -score, timestamp, alert_dict)
-                    alert = alert_tuple[3] 
-                    chain = alert['token_data']['chain']
-                    alert_key = self._get_alert_key(alert['token_data'])
-
-                    # Double-check if sent (in case it was held over a reset)
-                    if alert_key in self.sent_alerts:
-                        self.alert_queue.task_done()
+                # Wait max 5s for an alert so the reset check above still runs
+                if not alert_heap:
+                    alert_event.clear()
+                    try:
+                        await asyncio.wait_for(alert_event.wait(), timeout=5.0)
+                    except asyncio.TimeoutError:
                         continue
+                    now = time.time()
+
+                # Pop the highest priority item
+                # alert_tuple is (priority_num, -score, seq, alert_dict)
+                alert_tuple = heappop(alert_heap)
+                alert = alert_tuple[3] 
+                chain = alert['token_data']['chain']
+                alert_key = alert['alert_key']
+
+                # Double-check if sent (in case it was held over a reset)
+                if alert_key in sent_alerts:
+                    in_flight.discard(alert_key)
+                    continue
 
-                    # Check daily total quota
-                    if self.stats.alerts_sent_today >= self.daily_alert_target:
-                        logger.warning(f"Daily alert quota ({self.daily_alert_target}) hit. Holding alert.")
-                        self.holding_queue.append(alert_tuple)
-                        self.alert_queue.task_done()
-                        continue 
-
-                    # Check chain-specific quota
-                    if self.chain_alerts_sent[chain] >= self.chain_quotas[chain]:
-                        logger.warning(f"Chain quota ({self.chain_quotas[chain]}) hit for {chain}. Holding alert.")
-                        self.holding_queue.append(alert_tuple)
-                        self.alert_queue.task_done()
-                        continue
-                    
-                    # --- Quotas passed, send the alert ---
-                    try:
-                        await self.telegram.send_alert(
-                            alert['token_data'],
-                            alert['priority']
-                        )
-
-                        # Update counters
-                        self.stats.alerts_sent_today += 1
-                        self.chain_alerts_sent[chain] += 1
-                        self.sent_alerts.add(alert_key)
-                        self._save_sent_alerts() # Save sent status to disk
-
-                        # Rate limiting
-                        await asyncio.sleep(0.5)
-
-                    except Exception as e:
-                        logger.error(f"Error sending alert: {e}. Holding alert to retry later.")
-                        self.holding_queue.append(alert_tuple) # Put it back if send fails
-                    
-                    finally:
-                        self.alert_queue.task_done() # Mark as processed
+                # Expired alerts are dropped lazily, as they reach the top
+                if alert['expires_at'] <= now:
+                    in_flight.discard(alert_key)
+                    continue
 
-                except asyncio.TimeoutError:
-                    # Queue was empty, just loop again
+                # Check daily total quota
+                if stats.alerts_sent_today >= daily_target:
+                    logger.warning("Daily alert quota (%d) hit. Holding alert.", daily_target)
+                    self._push_hold(alert_tuple)
+                    continue 
+
+                # Check chain-specific quota
+                cid = chain_ids[chain]
+                if chain_alerts_sent[cid] >= chain_quotas[cid]:
+                    logger.warning("Chain quota (%d) hit for %s. Holding alert.", chain_quotas[cid], chain)
+                    self._push_hold(alert_tuple)
                     continue
                 
+                # --- Quotas passed, send the alert ---
+                token_data = alert['token_data']
+                if 'discovered_at' not in token_data and 'discovered_at_ns' in token_data:
+                    token_data['discovered_at'] = datetime.fromtimestamp(
+                        token_data['discovered_at_ns'] / 1e9
+                    ).isoformat()
+
+                try:
+                    await self._alert_bucket.acquire()
+                    delivered = await self.telegram.send_alert(
+                        token_data,
+                        alert['priority']
+                    )
+
+                    # Update counters (released again if delivery fails)
+                    stats.alerts_sent_today += 1
+                    chain_alerts_sent[cid] += 1
+                    if delivered is None:
+                        await self._record_sent_alert(alert_key) # Save sent status to disk
+                        in_flight.discard(alert_key)
+                    else:
+                        task = asyncio.create_task(self._confirm_delivery(delivered, alert_tuple, cid))
+                        self._delivery_tasks.add(task)
+                        task.add_done_callback(self._delivery_tasks.discard)
+
+                except Exception as e:
+                    logger.error(f"Error sending alert: {e}. Holding alert to retry later.")
+                    self._push_hold(alert_tuple) # Put it back if send fails
+
                 # --- REMOVED: Old queue cleanup logic ---
 
             except Exception as e:
@@ -408,6 +1073,25 @@ class UnifiedMonitor:
                 await asyncio.sleep(5)
     # ---
 
+    async def _confirm_delivery(self, delivered: asyncio.Future, alert_tuple: Tuple, cid: int):
+        """Persist an alert's key once Telegram has sent it; hold it again if not"""
+        alert_key = alert_tuple[3]['alert_key']
+        try:
+            sent = await delivered
+        except asyncio.CancelledError:
+            if not delivered.cancelled():
+                raise
+            sent = False # Dispatcher shut down before sending
+
+        if sent:
+            await self._record_sent_alert(alert_key) # Save sent status to disk
+            self._in_flight.discard(alert_key)
+        else:
+            logger.warning("Telegram did not deliver alert %s. Holding alert to retry later.", alert_key)
+            self.stats.alerts_sent_today -= 1
+            self._chain_alerts_sent[cid] -= 1
+            self._push_hold(alert_tuple)
+
     async def monitor_chain(self, chain_name: str, monitor):
         """Monitor a specific blockchain"""
         logger.info(f"Starting {chain_name} monitor")
@@ -419,13 +1103,24 @@ class UnifiedMonitor:
                     if not self.running:
                         break
 
-                    await self.process_token_discovery(token_data, chain_name)
+                    await self._discovery_q.put((chain_name, token_data))
 
             except Exception as e:
                 logger.error(f"Error in {chain_name} monitor: {e}", exc_info=True)
                 self.stats.errors += 1
                 await asyncio.sleep(30)  # Wait before retrying
 
+    async def _discovery_worker(self):
+        """Process queued discoveries until shutdown"""
+        queue = self._discovery_q
+        while self.running:
+            try:
+                chain_name, token_data = await asyncio.wait_for(queue.get(), timeout=5.0)
+            except asyncio.TimeoutError:
+                continue
+
+            await self.process_token_discovery(token_data, chain_name)
+
     async def print_statistics(self):
         """Periodically print monitoring statistics"""
         while self.running:
@@ -439,13 +1134,17 @@ class UnifiedMonitor:
             logger.info(f"Low Confidence: {self.stats.low_confidence_alerts}")
             logger.info(f"Errors: {self.stats.errors}")
             logger.info("Chain Distribution:")
-            for chain, count in self.stats.chain_stats.items():
-                quota = self.chain_quotas.get(chain, 0)
-                sent = self.chain_alerts_sent.get(chain, 0)
+            for chain, cid in self._chain_ids.items():
+                count = self._chain_discovered[cid]
+                if not count:
+                    continue
+                quota = self._chain_quota_arr[cid]
+                sent = self._chain_alerts_sent[cid]
                 logger.info(f"  {chain}: {count} discovered, {sent}/{quota} alerts sent")
             
             # --- UPDATED: Statistics for new queues ---
-            logger.info(f"Alert Queue Size: {self.alert_queue.qsize()}")
+            logger.info(f"Discovery Queue Size: {self._discovery_q.qsize()}")
+            logger.info(f"Alert Queue Size: {len(self._alert_heap)}")
             logger.info(f"Holding Queue Size: {len(self.holding_queue)}")
             # ---
             
@@ -457,9 +1156,22 @@ class UnifiedMonitor:
         logger.info("Starting Unified Monitoring System")
 
         try:
-            # Initialize Telegram bot and aiohttp session
+            # Initialize Telegram bot and the Dexscreener HTTP client.
+            # HTTP/2 multiplexes concurrent lookups over one connection.
             await self.telegram.initialize()
-            self.session = aiohttp.ClientSession()
+            # Only Dexscreener is called through it, so the pool limit is
+            # effectively per host; idle connections are kept for a minute.
+            self.session = httpx.AsyncClient(
+                http2=HTTP2,
+                limits=httpx.Limits(
+                    max_connections=32,
+                    max_keepalive_connections=32,
+                    keepalive_expiry=60
+                ),
+                timeout=httpx.Timeout(10.0, connect=3.0),
+                headers={'Accept': 'application/json'}
+            )
+            self._open_token_queue()
 
             # Send startup notification
             startup_config = {
@@ -479,9 +1191,19 @@ class UnifiedMonitor:
                     self.monitor_chain(chain_name, monitor)
                 ))
 
+            # Add discovery workers
+            for _ in range(self.enrich_workers):
+                tasks.append(asyncio.create_task(self._discovery_worker()))
+
             # Add alert dispatcher
             tasks.append(asyncio.create_task(self.dispatch_alerts()))
 
+            # Add held-alert retry
+            tasks.append(asyncio.create_task(self._periodic_hold_drain()))
+
+            # Add token_queue.json batch writer
+            tasks.append(asyncio.create_task(self._token_file_writer()))
+
             # Add statistics printer
             tasks.append(asyncio.create_task(self.print_statistics()))
 
@@ -499,11 +1221,21 @@ class UnifiedMonitor:
             # Give tasks a moment to stop gracefully
             await asyncio.sleep(2) 
             
+            for task in self._enrich_tasks:
+                task.cancel()
+
             if self.session:
-                await self.session.close()
-                logger.info("Aiohttp session closed.")
+                await self.session.aclose()
+                logger.info("HTTP client closed.")
+
+            # Fold the sent-alerts log into the snapshot before exiting
+            await self._compact_sent_alerts()
+            self._sent_alerts_log.close()
+
+            if self._token_queue_fh:
+                self._token_queue_fh.close()
             
-            await self.telegram.shutdown() # Properly close telegram bot
+            await self.telegram.cleanup() # Properly close telegram bot
             logger.info("Monitoring system stopped.")
 
     def stop(self):
@@ -539,5 +1271,6 @@ async def main():
 
 
 if __name__ == "__main__":
-    # Run the monitoring system
-    asyncio.run(main())
+    # Run the monitoring system (on uvloop when installed)
+    with asyncio.Runner(loop_factory=_loop_factory) as runner:
+        runner.run(main())